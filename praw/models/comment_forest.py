@@ -1,4 +1,5 @@
 """Provide CommentForest for Submission comments."""
+from collections import deque
 from heapq import heappop, heappush
 from typing import TYPE_CHECKING, List, Optional, Union
 
@@ -20,9 +21,9 @@ class CommentForest:
     def _gather_more_comments(tree, parent_tree=None):
         """Return a list of MoreComments objects obtained from tree."""
         more_comments = []
-        queue = [(None, x) for x in tree]
+        queue = deque((None, x) for x in tree)
         while queue:
-            parent, comment = queue.pop(0)
+            parent, comment = queue.popleft()
             if isinstance(comment, MoreComments):
                 heappush(more_comments, comment)
                 if parent:
@@ -100,9 +101,9 @@ class CommentForest:
 
         """
         comments = []
-        queue = list(self)
+        queue = deque(self)
         while queue:
-            comment = queue.pop(0)
+            comment = queue.popleft()
             comments.append(comment)
             if not isinstance(comment, MoreComments):
                 queue.extend(comment.replies)
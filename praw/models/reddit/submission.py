@@ -1,6 +1,9 @@
 """Provide the Submission class."""
+import re
+from functools import lru_cache
+from string import ascii_letters, digits
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
-from urllib.parse import urljoin
+from urllib.parse import urlparse
 from warnings import warn
 
 from prawcore import Conflict
@@ -20,6 +23,21 @@ from .subreddit import Subreddit
 if TYPE_CHECKING:  # pragma: no cover
     import praw
 
+# Translation table deleting ASCII letters and digits; an ID is valid when nothing
+# remains after applying it. Upper case is allowed as ID comparisons ignore case.
+_BASE36_DELETE = str.maketrans("", "", ascii_letters + digits)
+# Canonical redd.it and reddit.com comments URLs, matched in a single pass. A redd.it
+# ID must be the only path segment so that reserved segments such as ``r``,
+# ``comments`` and ``gallery`` are left to the general parser, as are comments URLs
+# with a ``gallery`` segment since the general parser gives that one precedence.
+_re_submission_url = re.compile(
+    r"https?://(?:www\.)?(?:redd\.it/(?!(?:comments|gallery|r)/?(?:[?#]|$))"
+    r"([0-9a-z]+)/?(?:[?#]|$)"
+    r"|reddit\.com(?![^?#]*/gallery(?:[/?#]|$))"
+    r"/(?:r/[^/?#]+/)?comments/([0-9a-z]+)(?:[/?#]|$))",
+    re.IGNORECASE,
+)
+
 
 class SubmissionFlair:
     """Provide a set of functions pertaining to Submission flair."""
@@ -98,6 +116,12 @@ class SubmissionModeration(ThingModerationMixin):
         """
         self.thing = submission
 
+    def _post(self, endpoint: str, **data: Any) -> Any:
+        """Post ``data`` along with the submission's fullname to ``endpoint``."""
+        return self.thing._reddit.post(
+            API_PATH[endpoint], data={"id": self.thing.fullname, **data}
+        )
+
     def contest_mode(self, state: bool = True):
         """Set contest mode for the comments of this submission.
 
@@ -120,10 +144,7 @@ class SubmissionModeration(ThingModerationMixin):
             submission.mod.contest_mode(state=True)
 
         """
-        self.thing._reddit.post(
-            API_PATH["contest_mode"],
-            data={"id": self.thing.fullname, "state": state},
-        )
+        self._post("contest_mode", state=state)
 
     def flair(
         self,
@@ -148,16 +169,18 @@ class SubmissionModeration(ThingModerationMixin):
             submission.mod.flair(text="PRAW", css_class="bot")
 
         """
+        submission = self.thing
         data = {
             "css_class": css_class,
-            "link": self.thing.fullname,
+            "link": submission.fullname,
             "text": text,
         }
-        url = API_PATH["flair"].format(subreddit=self.thing.subreddit)
-        if flair_template_id is not None:
+        if flair_template_id is None:
+            url = API_PATH["flair"]
+        else:
             data["flair_template_id"] = flair_template_id
-            url = API_PATH["select_flair"].format(subreddit=self.thing.subreddit)
-        self.thing._reddit.post(url, data=data)
+            url = API_PATH["select_flair"]
+        submission._reddit.post(url.format(subreddit=submission.subreddit), data=data)
 
     def nsfw(self):
         """Mark as not safe for work.
@@ -177,7 +200,7 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`~.sfw`
 
         """
-        self.thing._reddit.post(API_PATH["marknsfw"], data={"id": self.thing.fullname})
+        self._post("marknsfw")
 
     def set_original_content(self):
         """Mark as original content.
@@ -198,14 +221,15 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`.unset_original_content`
 
         """
+        submission = self.thing
         data = {
-            "id": self.thing.id,
-            "fullname": self.thing.fullname,
+            "id": submission.id,
+            "fullname": submission.fullname,
             "should_set_oc": True,
             "executed": False,
-            "r": self.thing.subreddit,
+            "r": submission.subreddit,
         }
-        self.thing._reddit.post(API_PATH["set_original_content"], data=data)
+        submission._reddit.post(API_PATH["set_original_content"], data=data)
 
     def sfw(self):
         """Mark as safe for work.
@@ -225,9 +249,7 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`~.nsfw`
 
         """
-        self.thing._reddit.post(
-            API_PATH["unmarknsfw"], data={"id": self.thing.fullname}
-        )
+        self._post("unmarknsfw")
 
     def spoiler(self):
         """Indicate that the submission contains spoilers.
@@ -247,7 +269,7 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`~.unspoiler`
 
         """
-        self.thing._reddit.post(API_PATH["spoiler"], data={"id": self.thing.fullname})
+        self._post("spoiler")
 
     def sticky(self, state: bool = True, bottom: bool = True):
         """Set the submission's sticky state in its subreddit.
@@ -274,11 +296,11 @@ class SubmissionModeration(ThingModerationMixin):
             submission.mod.sticky()
 
         """
-        data = {"id": self.thing.fullname, "state": state}
+        data = {"state": state}
         if not bottom:
             data["num"] = 1
         try:
-            return self.thing._reddit.post(API_PATH["sticky_submission"], data=data)
+            return self._post("sticky_submission", **data)
         except Conflict:
             pass
 
@@ -289,10 +311,7 @@ class SubmissionModeration(ThingModerationMixin):
             qa, blank (default: blank).
 
         """
-        self.thing._reddit.post(
-            API_PATH["suggested_sort"],
-            data={"id": self.thing.fullname, "sort": sort},
-        )
+        self._post("suggested_sort", sort=sort)
 
     def unset_original_content(self):
         """Indicate that the submission is not original content.
@@ -313,14 +332,15 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`.set_original_content`
 
         """
+        submission = self.thing
         data = {
-            "id": self.thing.id,
-            "fullname": self.thing.fullname,
+            "id": submission.id,
+            "fullname": submission.fullname,
             "should_set_oc": False,
             "executed": False,
-            "r": self.thing.subreddit,
+            "r": submission.subreddit,
         }
-        self.thing._reddit.post(API_PATH["set_original_content"], data=data)
+        submission._reddit.post(API_PATH["set_original_content"], data=data)
 
     def unspoiler(self):
         """Indicate that the submission does not contain spoilers.
@@ -340,7 +360,7 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`~.spoiler`
 
         """
-        self.thing._reddit.post(API_PATH["unspoiler"], data={"id": self.thing.fullname})
+        self._post("unspoiler")
 
     def update_crowd_control_level(self, level: int):
         """Change the Crowd Control level of the submission.
@@ -374,10 +394,7 @@ class SubmissionModeration(ThingModerationMixin):
             :meth:`~.CommentModeration.show`
 
         """
-        self.thing._reddit.post(
-            API_PATH["update_crowd_control"],
-            data={"id": self.thing.fullname, "level": level},
-        )
+        self._post("update_crowd_control", level=level)
 
 
 class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, RedditBase):
@@ -436,6 +453,7 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
     STR_FIELD = "id"
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def id_from_url(url: str) -> str:
         """Return the ID contained within a submission URL.
 
@@ -450,24 +468,51 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
         :raises: :class:`.InvalidURL` if URL is not a valid submission URL.
 
         """
-        parts = RedditBase._url_parts(url)
-        if "comments" not in parts and "gallery" not in parts:
-            submission_id = parts[-1]
-            if "r" in parts:
-                raise InvalidURL(
-                    url, message="Invalid URL (subreddit, not submission): {}"
-                )
-
-        elif "gallery" in parts:
-            submission_id = parts[parts.index("gallery") + 1]
-
-        elif parts[-1] == "comments":
-            raise InvalidURL(url, message="Invalid URL (submission id not present): {}")
-
+        match = _re_submission_url.match(url)
+        if match:
+            return match.group(1) or match.group(2)
+
+        scheme_end = url.find("://")
+        if (
+            scheme_end < 1
+            or not url[:scheme_end].isalpha()
+            or "?" in url
+            or "#" in url
+            or ";" in url
+        ):
+            parsed = urlparse(url)
+            if not parsed.netloc:
+                raise InvalidURL(url)
+            path = parsed.path
         else:
-            submission_id = parts[parts.index("comments") + 1]
-
-        if not submission_id.isalnum():
+            host_end = url.find("/", scheme_end + 3)
+            if host_end == scheme_end + 3:
+                raise InvalidURL(url)
+            path = "" if host_end == -1 else url[host_end:]
+        # Normalize the path so that every segment is surrounded by slashes.
+        path = path.rstrip("/") + "/"
+
+        start = path.find("/gallery/")
+        if start != -1:
+            start += len("/gallery/")
+            submission_id = path[start : path.find("/", start)]
+        else:
+            start = path.find("/comments/")
+            if start == -1:
+                if "/r/" in path:
+                    raise InvalidURL(
+                        url, message="Invalid URL (subreddit, not submission): {}"
+                    )
+                submission_id = path[path.rfind("/", 0, -1) + 1 : -1]
+            else:
+                start += len("/comments/")
+                if start == len(path):
+                    raise InvalidURL(
+                        url, message="Invalid URL (submission id not present): {}"
+                    )
+                submission_id = path[start : path.find("/", start)]
+
+        if not submission_id or submission_id.translate(_BASE36_DELETE):
             raise InvalidURL(url)
         return submission_id
 
@@ -507,7 +552,13 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
 
         """
         # This assumes _comments is set so that _fetch is called when it's not.
-        return self._comments
+        comments = self._comments
+        # Linking the fetched comments to this submission walks the whole tree, so it
+        # is deferred until the forest is first requested.
+        pending = self.__dict__.pop("_pending_comments", None)
+        if pending is not None:
+            comments._update(pending)
+        return comments
 
     @cachedproperty
     def flair(self) -> SubmissionFlair:
@@ -550,7 +601,10 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
         https://www.reddit.com/r/announcements/comments/eorhm/reddit_30_less_typing/.
 
         """
-        return urljoin(self._reddit.config.short_url, self.id)
+        short_url = self._reddit.config.short_url
+        if short_url.endswith("/"):
+            return short_url + self.id
+        return f"{short_url}/{self.id}"
 
     def __init__(
         self,
@@ -575,10 +629,11 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
         # Specify the sort order for ``comments``
         self.comment_sort = "confidence"
 
+        # ``id`` needs none of the objectification done in ``__setattr__``.
         if id:
-            self.id = id
+            self.__dict__["id"] = id
         elif url:
-            self.id = self.id_from_url(url)
+            self.__dict__["id"] = self.id_from_url(url)
 
         super().__init__(reddit, _data=_data)
 
@@ -594,9 +649,10 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
             value = PollData(self._reddit, value)
         elif (
             attribute == "comment_sort"
-            and hasattr(self, "_fetched")
-            and self._fetched
-            and hasattr(self, "_reddit")
+            # Avoid ``hasattr`` here: ``__init__`` sets ``comment_sort`` before
+            # ``_fetched`` exists, so every construction would raise an AttributeError
+            # in ``__getattr__`` only for ``hasattr`` to catch it.
+            and self.__dict__.get("_fetched")
             and self._reddit.config.warn_comment_sort
         ):
             warn(
@@ -611,7 +667,7 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
             all_submissions += [x.fullname for x in other_submissions]
 
         for position in range(0, len(all_submissions), chunk_size):
-            yield ",".join(all_submissions[position : position + 50])
+            yield ",".join(all_submissions[position : position + chunk_size])
 
     def _fetch_info(self):
         return (
@@ -626,24 +682,31 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
         return self._reddit.request("GET", path, params)
 
     def _fetch(self):
-        data = self._fetch_data()
-        submission_listing, comment_listing = data
-        comment_listing = Listing(self._reddit, _data=comment_listing["data"])
+        submission_listing, comment_listing = self._fetch_data()
+        reddit = self._reddit
+        comment_listing = Listing(reddit, _data=comment_listing["data"])
 
         submission_data = submission_listing["data"]["children"][0]["data"]
-        submission = type(self)(self._reddit, _data=submission_data)
-        delattr(submission, "comment_limit")
-        delattr(submission, "comment_sort")
-        submission._comments = CommentForest(self)
+        submission = type(self)(reddit, _data=submission_data)
+        fetched = submission.__dict__
+        del fetched["comment_limit"]
+        del fetched["comment_sort"]
+        fetched["_comments"] = CommentForest(self)
+        fetched["_pending_comments"] = comment_listing.children
 
-        self.__dict__.update(submission.__dict__)
-        self.comments._update(comment_listing.children)
+        self.__dict__.update(fetched)
 
         self._fetched = True
 
-    def mark_visited(self):
+    def mark_visited(
+        self, other_submissions: Optional[List["praw.models.Submission"]] = None
+    ):
         """Mark submission as visited.
 
+        :param other_submissions: When provided, additionally mark this list of
+            :class:`.Submission` instances as visited as part of a single request
+            (default: None).
+
         This method requires a subscription to reddit premium.
 
         Example usage:
@@ -654,8 +717,8 @@ class Submission(SubmissionListingMixin, UserContentMixin, FullnameMixin, Reddit
             submission.mark_visited()
 
         """
-        data = {"links": self.fullname}
-        self._reddit.post(API_PATH["store_visits"], data=data)
+        for submissions in self._chunk(other_submissions, 50):
+            self._reddit.post(API_PATH["store_visits"], data={"links": submissions})
 
     def hide(self, other_submissions: Optional[List["praw.models.Submission"]] = None):
         """Hide Submission.
@@ -1,9 +1,11 @@
 import pickle
+from unittest import mock
 
 import pytest
 
 from praw.exceptions import ClientException
-from praw.models import Submission
+from praw.models import Comment, Submission
+from praw.models.comment_forest import CommentForest
 
 from ... import UnitTest
 
@@ -22,6 +24,20 @@ class TestSubmission(UnitTest):
         assert "dummy1" == submission1
         assert submission2 == "dummy1"
 
+    def test_comments__linked_on_access(self):
+        submission = Submission(self.reddit, _data={"id": "dummy"})
+        comment = Comment(self.reddit, _data={"id": "dummy1", "replies": ""})
+        submission.__dict__.update(
+            _comments=CommentForest(submission),
+            _fetched=True,
+            _pending_comments=[comment],
+        )
+        assert submission._comments_by_id == {}
+        assert submission.comments[0] is comment
+        assert comment.submission is submission
+        assert submission._comments_by_id == {"t1_dummy1": comment}
+        assert "_pending_comments" not in submission.__dict__
+
     def test_construct_failure(self):
         message = "Exactly one of `id`, `url`, or `_data` must be provided."
         with pytest.raises(TypeError) as excinfo:
@@ -95,10 +111,29 @@ class TestSubmission(UnitTest):
             "http://reddit.com/comments/2gmzqe",
             "https://www.reddit.com/r/redditdev/comments/2gmzqe/praw_https_enabled_praw_testing_needed/",
             "https://www.reddit.com/gallery/2gmzqe",
+            "https://redd.it/2gmzqe?utm_source=share",
+            "https://www.reddit.com/r/redditdev/comments/2gmzqe/#comments",
+            "HTTPS://WWW.REDDIT.COM/r/redditdev/comments/2gmzqe",
+            "https://www.reddit.com/r/redditdev/comments/2gmzqe;params",
         ]
         for url in urls:
             assert Submission.id_from_url(url) == "2gmzqe", url
 
+    def test_id_from_url__cached(self):
+        Submission.id_from_url.cache_clear()
+        url = "https://redd.it/2gmzqe"
+        assert Submission.id_from_url(url) == "2gmzqe"
+        assert Submission.id_from_url(url) == "2gmzqe"
+        assert Submission.id_from_url.cache_info().hits == 1
+        for _ in range(2):
+            with pytest.raises(ClientException):
+                Submission.id_from_url("https://redd.it/_")
+
+    def test_id_from_url__gallery_precedence(self):
+        for host in ("www.reddit.com", "old.reddit.com"):
+            url = f"https://{host}/r/redditdev/comments/2gmzqe/gallery/abc123"
+            assert Submission.id_from_url(url) == "abc123", url
+
     def test_id_from_url__invalid_urls(self):
         urls = [
             "",
@@ -112,11 +147,27 @@ class TestSubmission(UnitTest):
             "https://reddit.com/r/wallpapers",
             "https://www.reddit.com/r/test/comments/",
             "https://reddit.com/comments/",
+            "https://www.reddit.com/gallery/",
+            "https://redd.it",
+            "https://redd.it/2gmzq\u00e9",
+            "https://redd.it/2gmzqe_",
+            "https://reddit.com/comments/2gmzqe.json",
+            "https://redd.it/r/sub",
+            "https://redd.it/comments/",
         ]
         for url in urls:
             with pytest.raises(ClientException):
                 Submission.id_from_url(url)
 
+    @mock.patch("praw.Reddit.post")
+    def test_mark_visited__batches(self, mock_post):
+        submissions = [Submission(self.reddit, f"a{i}") for i in range(75)]
+        submissions[0].mark_visited(submissions[1:])
+        assert [call[1]["data"]["links"] for call in mock_post.call_args_list] == [
+            ",".join(f"t3_a{i}" for i in range(50)),
+            ",".join(f"t3_a{i}" for i in range(50, 75)),
+        ]
+
     def test_pickle(self):
         submission = Submission(self.reddit, _data={"id": "dummy"})
         for level in range(pickle.HIGHEST_PROTOCOL + 1):
@@ -134,3 +185,8 @@ class TestSubmission(UnitTest):
     def test_shortlink(self):
         submission = Submission(self.reddit, _data={"id": "dummy"})
         assert submission.shortlink == "https://redd.it/dummy"
+
+    def test_shortlink__trailing_slash(self):
+        self.reddit.config._short_url = "https://redd.it/"
+        submission = Submission(self.reddit, _data={"id": "dummy"})
+        assert submission.shortlink == "https://redd.it/dummy"